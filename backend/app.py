@@ -1,8 +1,9 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 import os
-import threading
+import queue
 import logging
+import orjson
 
 from assistant import PersonalAssistant
 from speech_handler import SpeechHandler
@@ -15,12 +16,22 @@ CORS(app)
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s")
 logger = logging.getLogger("ASSISTANT")
 
+# Server-side TTS only for headless/kiosk setups; browsers speak for themselves
+LOCAL_TTS = os.environ.get("LOCAL_TTS") == "1"
+
 # Services
-reminder_manager = ReminderManager()
-assistant = PersonalAssistant(reminder_manager=reminder_manager)
 speech = SpeechHandler()
+popup_queue = queue.Queue()  # triggered reminders waiting for the frontend
+reminder_manager = ReminderManager(
+    speech=speech if LOCAL_TTS else None, popup_queue=popup_queue
+)
+assistant = PersonalAssistant(reminder_manager=reminder_manager)
+
+
+def orjson_response(payload):
+    """JSON response encoded with orjson (faster than jsonify's stdlib json)."""
+    return app.response_class(orjson.dumps(payload), mimetype="application/json")
 
-last_popup_sent = None
 
 #HEALTH + HOME ROUTES
 
@@ -31,7 +42,7 @@ def home():
 
 @app.route("/health", methods=["GET"])
 def health_check():
-    return jsonify({
+    return orjson_response({
         "server": "running",
         "reminders_active": len(reminder_manager.get_reminders()),
         "tts": True,
@@ -54,13 +65,28 @@ def process_cmd():
     except Exception as e:
         return jsonify({"success": False, "error": str(e)})
 
+
+@app.route("/process/stream", methods=["POST"])
+def process_cmd_stream():
+    """Server-Sent Events variant of /process: one `data:` event per chunk."""
+    data = request.get_json() or {}
+    if "command" not in data:
+        return jsonify({"success": False, "error": "Missing command"})
+
+    def events():
+        for chunk in assistant.process_command_stream(data["command"]):
+            yield b"data: " + orjson.dumps(chunk) + b"\n\n"
+        yield b"event: done\ndata: {}\n\n"
+
+    return Response(events(), mimetype="text/event-stream")
+
 #SPEECH TO TEXT
 
 @app.route('/listen', methods=['POST'])
 def listen_command():
     try:
         options = request.get_json() or {}
-        text = SpeechHandler.listen(
+        text = speech.listen(
             timeout=options.get("timeout", 5),
             phrase_time_limit=options.get("phrase_time_limit", 10)
         )
@@ -77,30 +103,50 @@ def listen_command():
         print("❌ Speech Recognition Crash:", e)
         return jsonify({"error": str(e), "success": False}), 500
 
+
+@app.route("/recalibrate", methods=["POST"])
+def recalibrate():
+    """Re-sample the microphone noise floor (e.g. after moving rooms)."""
+    return jsonify({"success": speech.recalibrate()})
+
 #TEXT TO SPEECH
 
 @app.route("/speak", methods=["POST"])
 def speak_out():
-    """Still supported — but frontend TTS is used by default."""
+    """Speaks on the server only with ?local=1 (kiosk mode); otherwise the
+    client is told to use its own speechSynthesis."""
     data = request.get_json()
     if "text" not in data:
         return jsonify({"success": False, "error": "Missing 'text'"})
 
-    threading.Thread(target=speech.speak, args=(data["text"],), daemon=True).start()
-    return jsonify({"success": True})
+    if request.args.get("local") == "1":
+        speech.speak(data["text"])
+        return jsonify({"success": True})
+
+    return jsonify({"success": True, "speak": True, "text": data["text"]})
 
 #REMINDERS API
 
+# (ReminderManager.version, encoded /reminders body)
+_reminders_cache = (None, b"")
+
 @app.route("/reminders", methods=["GET"])
 def list_reminders():
-    r = reminder_manager.get_reminders()
-    formatted = [{
-        "id": item["id"],
-        "text": item["text"],
-        "time": item["time"].strftime("%I:%M %p %d-%b"),
-    } for item in r]
+    global _reminders_cache
+
+    version = reminder_manager.version
+    if _reminders_cache[0] != version:
+        formatted = [{
+            "id": item["id"],
+            "text": item["text"],
+            "time": item["time_fmt"],
+        } for item in reminder_manager.get_reminders()]
+        _reminders_cache = (
+            version,
+            orjson.dumps({"success": True, "reminders": formatted}),
+        )
 
-    return jsonify({"success": True, "reminders": formatted})
+    return app.response_class(_reminders_cache[1], mimetype="application/json")
 
 
 @app.route("/reminders/<int:id>", methods=["DELETE"])
@@ -116,24 +162,21 @@ def clear_all():
 
 
 #REMINDER POPUP EVENT API 
-last_reminder_served = set()  
 
 @app.route("/trigger_popup", methods=["GET"])
 def trigger_popup():
-    reminders = reminder_manager.get_reminders_raw()
-
-    for r in reminders:
-        if r["triggered"] and not r.get("popup_acknowledged", False):
-            r["popup_acknowledged"] = True 
-
-            return jsonify({
-                "success": True,
-                "message": r["text"],
-                "id": r["id"],
-                "time": r["time"].strftime("%I:%M %p %d-%b")
-            })
-
-    return jsonify({"success": False})
+    try:
+        r = popup_queue.get_nowait()
+    except queue.Empty:
+        return orjson_response({"success": False})
+
+    return orjson_response({
+        "success": True,
+        "message": r["text"],
+        "speak": not LOCAL_TTS,
+        "id": r["id"],
+        "time": r["time_fmt"]
+    })
 
 @app.route("/history", methods=["GET", "DELETE"])
 def history():
@@ -141,7 +184,7 @@ def history():
         assistant.clear_history()
         return jsonify({"success": True})
 
-    return jsonify({"success": True, "history": assistant.get_history()})
+    return orjson_response({"success": True, "history": assistant.get_history()})
 
 if __name__ == '__main__':
     print("🚀 Flask API starting...")
@@ -6,7 +6,8 @@ Personal AI Assistant — FINAL VERSION
 """
 
 import re
-from search_ai import ai_web_search
+from collections import deque
+from search_ai import ai_web_search, ai_web_search_stream
 from utils import (
     get_current_time,
     get_current_date,
@@ -16,10 +17,60 @@ from utils import (
 )
 
 
+def _keyword_pattern(words):
+    """Compile plain substrings into a single alternation (same as `any(w in c)`)."""
+    return re.compile("|".join(re.escape(w) for w in words))
+
+
+# Intent keywords, one regex scan per intent instead of one `in` per word
+_GREETING_RE = _keyword_pattern(
+    ["hi", "hello", "hey", "good morning", "good afternoon", "good evening"]
+)
+_EXIT_COMMANDS = frozenset(["bye", "exit", "quit", "close", "goodbye"])
+_HELP_RE = _keyword_pattern(["help", "what can you do", "commands", "how do i use you"])
+_DATE_RE = _keyword_pattern(["date", "day"])
+_MATH_WORD_RE = _keyword_pattern(
+    [
+        "calculate",
+        "plus",
+        "minus",
+        "divide",
+        "multiply",
+        "times",
+        "add",
+        "subtract",
+        "over",
+        "x",
+    ]
+)
+_DIGIT_RE = re.compile(r"\d")
+_MATH_SYMBOL_RE = re.compile(r"[+\-*/×÷]")
+_SEARCH_RE = _keyword_pattern(
+    [
+        "who",
+        "what",
+        "when",
+        "where",
+        "why",
+        "how",
+        "tell me about",
+        "search",
+        "find",
+        "look up",
+        "explain",
+        "define",
+        "information about",
+    ]
+)
+_REMINDER_RE = _keyword_pattern(
+    ["remind", "reminder", "don't forget", "alert me", "notify me"]
+)
+
+
 class PersonalAssistant:
     def __init__(self, reminder_manager=None):
         self.name = "Assistant"
-        self.history = []          # list of {"you": ..., "assistant": ...}
+        self.history = deque(maxlen=500)  # latest {"you": ...} / {"assistant": ...} entries
         self.rm = reminder_manager # ReminderManager instance
 
     # ================= MAIN ENTRY =================
@@ -36,6 +87,29 @@ class PersonalAssistant:
         self.history.append({"assistant": response})
         return response
 
+    def process_command_stream(self, cmd: str):
+        """Like process_command, but yields the response in chunks.
+        Web-search answers are streamed from Gemini; every other intent
+        yields its full response once."""
+        if not cmd:
+            yield "I didn’t catch that, try again."
+            return
+
+        cmd = cmd.lower().strip()
+        self.history.append({"you": cmd})
+
+        if self._is_exit_command(cmd) or self._is_help_query(cmd) or not self._is_search_query(cmd):
+            chunks = [self._route(cmd)]
+        else:
+            chunks = ai_web_search_stream(cmd)
+
+        parts = []
+        for chunk in chunks:
+            parts.append(chunk)
+            yield chunk
+
+        self.history.append({"assistant": "".join(parts).strip()})
+
     # ================= ROUTER =====================
     def _route(self, c: str) -> str:
         # 1) Exit
@@ -74,45 +148,31 @@ class PersonalAssistant:
     # =============== INTENT DETECTORS ==============
 
     def _is_greeting(self, c: str) -> bool:
-        words = ["hi", "hello", "hey", "good morning", "good afternoon", "good evening"]
-        return any(w in c for w in words)
+        return bool(_GREETING_RE.search(c))
 
     def _is_exit_command(self, c: str) -> bool:
-        return c in ["bye", "exit", "quit", "close", "goodbye"]
+        return c in _EXIT_COMMANDS
 
     def _is_help_query(self, c: str) -> bool:
-        phrases = ["help", "what can you do", "commands", "how do i use you"]
-        return any(p in c for p in phrases)
+        return bool(_HELP_RE.search(c))
 
     def _is_time_query(self, c: str) -> bool:
         # avoid matching "times" in math
         return "time" in c and "times" not in c
 
     def _is_date_query(self, c: str) -> bool:
-        return any(x in c for x in ["date", "day"]) and "update" not in c
+        return bool(_DATE_RE.search(c)) and "update" not in c
 
     def _is_math_query(self, c: str) -> bool:
         # must contain a digit and a math keyword
-        if not re.search(r"\d", c):
+        if not _DIGIT_RE.search(c):
             return False
 
-        math_words = [
-            "calculate",
-            "plus",
-            "minus",
-            "divide",
-            "multiply",
-            "times",
-            "add",
-            "subtract",
-            "over",
-            "x",
-        ]
-        if any(w in c for w in math_words):
+        if _MATH_WORD_RE.search(c):
             return True
 
         # or math symbols
-        return bool(re.search(r"[+\-*/×÷]", c))
+        return bool(_MATH_SYMBOL_RE.search(c))
 
     def _is_search_query(self, c: str) -> bool:
         """
@@ -122,30 +182,14 @@ class PersonalAssistant:
         - what is quantum computing
         - tell me about tesla
         """
-        keywords = [
-            "who",
-            "what",
-            "when",
-            "where",
-            "why",
-            "how",
-            "tell me about",
-            "search",
-            "find",
-            "look up",
-            "explain",
-            "define",
-            "information about",
-        ]
-
         # Don’t steal pure math / time questions
         if self._is_math_query(c) or self._is_time_query(c):
             return False
 
-        return any(k in c for k in keywords)
+        return bool(_SEARCH_RE.search(c))
 
     def _is_reminder_query(self, c: str) -> bool:
-        return any(x in c for x in ["remind", "reminder", "don't forget", "alert me", "notify me"])
+        return bool(_REMINDER_RE.search(c))
 
     # ================= HANDLERS =====================
 
@@ -187,7 +231,7 @@ class PersonalAssistant:
     # ================= HISTORY =====================
 
     def get_history(self):
-        return self.history
+        return list(self.history)
 
     def clear_history(self):
-        self.history = []
+        self.history.clear()
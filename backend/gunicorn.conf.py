@@ -0,0 +1,22 @@
+"""
+Gunicorn config - production server for the Flask API
+Run from backend/:  gunicorn app:app
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+
+# Reminders, popups and chat history live in process memory, so all
+# requests must hit the same worker; concurrency comes from threads.
+workers = 1
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 8))
+timeout = 60
+
+
+def post_worker_init(worker):
+    """Start the reminder scheduler inside the (single) worker process."""
+    import app
+
+    app.reminder_manager.start()
@@ -2,19 +2,38 @@
 Reminder Manager - Handles scheduled reminders with notifications
 """
 
+import heapq
 import threading
 import time
-import requests
 from datetime import datetime, timedelta
 import re
 
+# Time-string patterns used by ReminderManager._parse_time
+_RE_REL = re.compile(r"\bin\s+(\d+)\s*(minute|minutes|min|mins|hour|hours|hr|hrs)\b")
+_RE_AMPM = re.compile(r"\b(\d{1,2})(?::(\d{2}))?\s*(am|pm)\b")
+_RE_24 = re.compile(r"\b(\d{1,2}):(\d{2})\b")
+_RE_WS = re.compile(r"\s+")
+
 
 class ReminderManager:
     """Manages scheduled reminders"""
 
-    def __init__(self):
-        self.reminders = []
+    def __init__(self, speech=None, popup_queue=None):
+        """
+        Args:
+            speech: SpeechHandler used to voice triggered reminders
+            popup_queue: queue.Queue that receives triggered reminders for the frontend popup
+        """
+        self.speech = speech
+        self.popup_queue = popup_queue
+        self.reminders = {}  # id -> reminder dict (insertion ordered)
+        self._heap = []      # (target epoch seconds, id), earliest first
+        self.cv = threading.Condition()
+        # Condition timeouts use the monotonic clock, which stops during
+        # system suspend; re-check wall-clock time at least this often
+        self.max_wait = 30
         self.reminder_id_counter = 0
+        self.version = 0  # bumped whenever the upcoming-reminders list changes
         self.checker_thread = None
         self.running = False
         self.callback = None
@@ -41,7 +60,9 @@ class ReminderManager:
 
     def stop(self):
         """Stop the reminder checker thread"""
-        self.running = False
+        with self.cv:
+            self.running = False
+            self.cv.notify()
         if self.checker_thread:
             self.checker_thread.join(timeout=2)
         print("Reminder Service ⏹ Stopped")
@@ -73,17 +94,22 @@ class ReminderManager:
                     "message": "That time has already passed. Please specify a future time.",
                 }
 
-            self.reminder_id_counter += 1
-            reminder = {
-                "id": self.reminder_id_counter,
-                "text": text.strip(),
-                "time": target_time,
-                "time_str": time_str,
-                "created_at": datetime.now(),
-                "triggered": False,
-            }
+            with self.cv:
+                self.reminder_id_counter += 1
+                reminder = {
+                    "id": self.reminder_id_counter,
+                    "text": text.strip(),
+                    "time": target_time,
+                    "time_fmt": target_time.strftime("%I:%M %p %d-%b"),
+                    "time_str": time_str,
+                    "created_at": datetime.now(),
+                    "triggered": False,
+                }
 
-            self.reminders.append(reminder)
+                self.reminders[reminder["id"]] = reminder
+                heapq.heappush(self._heap, (target_time.timestamp(), reminder["id"]))
+                self.version += 1
+                self.cv.notify()
 
             time_until = self._format_time_until(target_time)
 
@@ -102,17 +128,26 @@ class ReminderManager:
         include_triggered=True  -> return all
         include_triggered=False -> only upcoming (NOT triggered)
         """
-        if include_triggered:
-            return self.reminders
-        return [r for r in self.reminders if not r["triggered"]]
+        with self.cv:
+            if include_triggered:
+                return list(self.reminders.values())
+            return [r for r in self.reminders.values() if not r["triggered"]]
 
     def delete_reminder(self, reminder_id):
         """Delete a reminder by ID"""
-        self.reminders = [r for r in self.reminders if r["id"] != reminder_id]
+        with self.cv:
+            # Stale heap entries are skipped when they come due
+            self.reminders.pop(reminder_id, None)
+            self.version += 1
+            self.cv.notify()
 
     def clear_all(self):
         """Clear all reminders"""
-        self.reminders = []
+        with self.cv:
+            self.reminders = {}
+            self._heap = []
+            self.version += 1
+            self.cv.notify()
 
     # -------------------------------------------------
     # INTERNAL HELPERS
@@ -134,12 +169,10 @@ class ReminderManager:
         ts = time_str.strip().lower()
         ts = ts.replace("p.m.", "pm").replace("p. m.", "pm")
         ts = ts.replace("a.m.", "am").replace("a. m.", "am")
-        ts = re.sub(r"\s+", " ", ts)
+        ts = _RE_WS.sub(" ", ts)
 
         # --- relative: "in 5 minutes / hours"
-        m_rel = re.search(
-            r"\bin\s+(\d+)\s*(minute|minutes|min|mins|hour|hours|hr|hrs)\b", ts
-        )
+        m_rel = _RE_REL.search(ts)
         if m_rel:
             amount = int(m_rel.group(1))
             unit = m_rel.group(2)
@@ -149,10 +182,7 @@ class ReminderManager:
                 return now + timedelta(minutes=amount)
 
         # --- "HH:MM am/pm" or "H am/pm"
-        m_ampm = re.search(
-            r"\b(\d{1,2})(?::(\d{2}))?\s*(am|pm)\b",
-            ts,
-        )
+        m_ampm = _RE_AMPM.search(ts)
         if m_ampm:
             hour = int(m_ampm.group(1))
             minute = int(m_ampm.group(2)) if m_ampm.group(2) else 0
@@ -169,7 +199,7 @@ class ReminderManager:
             return target
 
         # --- pure 24h "HH:MM"
-        m_24 = re.search(r"\b(\d{1,2}):(\d{2})\b", ts)
+        m_24 = _RE_24.search(ts)
         if m_24:
             hour = int(m_24.group(1))
             minute = int(m_24.group(2))
@@ -200,40 +230,45 @@ class ReminderManager:
         return "very soon"
 
     def _check_reminders(self):
-        """Background thread that checks and triggers reminders"""
+        """Background thread that sleeps until the next reminder is due"""
         while self.running:
-            now = datetime.now()
-
-            for reminder in self.reminders:
-                if not reminder["triggered"] and reminder["time"] <= now:
-                    reminder["triggered"] = True
-                    print(f"⏰ Reminder Triggered: {reminder['text']}")
-
-                    # 1) Voice output
+            due = []
+            with self.cv:
+                now = time.time()
+                while self._heap and self._heap[0][0] <= now:
+                    _, reminder_id = heapq.heappop(self._heap)
+                    reminder = self.reminders.get(reminder_id)
+                    if reminder and not reminder["triggered"]:
+                        reminder["triggered"] = True
+                        self.version += 1
+                        due.append(reminder)
+
+                if not due:
+                    # Woken early by add/delete/clear/stop -> re-evaluate
+                    timeout = self.max_wait
+                    if self._heap:
+                        timeout = min(max(0, self._heap[0][0] - now), self.max_wait)
+                    self.cv.wait(timeout=timeout)
+                    continue
+
+            for reminder in due:
+                print(f"⏰ Reminder Triggered: {reminder['text']}")
+
+                # 1) Voice output (queued to the TTS worker thread)
+                if self.speech:
+                    self.speech.speak(f"Reminder! {reminder['text']}")
+
+                # 2) Frontend popup polling
+                if self.popup_queue is not None:
+                    self.popup_queue.put(reminder)
+
+                if self.callback:
                     try:
-                        requests.post(
-                            "http://localhost:5000/speak",
-                            json={"text": f"Reminder! {reminder['text']}"},
-                            timeout=2,
-                        )
+                        self.callback(reminder)
                     except Exception as e:
-                        print("TTS Failed:", e)
-
-                    # 2) Frontend popup polling
-                    try:
-                        requests.get(
-                            "http://localhost:5000/trigger_popup", timeout=2
-                        )
-                    except Exception as e:
-                        print("Popup trigger failed:", e)
-
-                    if self.callback:
-                        try:
-                            self.callback(reminder)
-                        except Exception as e:
-                            print("Reminder callback error:", e)
+                        print("Reminder callback error:", e)
 
-            time.sleep(3)
     def get_reminders_raw(self):
         """Return full internal reminder objects including triggered status."""
-        return self.reminders  # Not formatted/filtered
+        with self.cv:
+            return list(self.reminders.values())  # Not formatted/filtered
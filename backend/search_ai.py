@@ -1,7 +1,10 @@
 # ===================== search_ai.py (FINAL + SECURE) =====================
 import os
-import json
-import requests
+import functools
+import logging
+import time
+import httpx
+import orjson
 from dotenv import load_dotenv
 import google.generativeai as genai
 
@@ -16,42 +19,66 @@ if not GEMINI_API_KEY or not SERPER_KEY:
 
 genai.configure(api_key=GEMINI_API_KEY)
 
+logger = logging.getLogger(__name__)
 
-def ai_web_search(query):
-    """Google Search → Gemini Answer Engine (Strongly Improved Accuracy)"""
+# Prompt budget for Gemini: knowledge graph / answer box first, then the top
+# organic hits up to MAX_RESULTS lines; MAX_INFO_CHARS is only a safety cap
+MAX_RESULTS = 5
+MAX_INFO_CHARS = 4000
 
-    try:
-        response = requests.post(
-            "https://google.serper.dev/search",
-            headers={"X-API-KEY": SERPER_KEY, "Content-Type": "application/json"},
-            json={"q": query}
-        )
-        data = response.json()
+# Cached answers go stale after this many seconds (news, scores, prices)
+_CACHE_TTL = 600
+
+# Built once and reused for every answer
+_MODEL = genai.GenerativeModel(
+    "models/gemini-2.5-flash",
+    generation_config={"temperature": 0.2},
+)
+
+# Shared HTTP/2 client: keeps the TLS connection to Serper alive between queries
+_HTTP = httpx.Client(
+    http2=True,
+    timeout=10.0,
+    headers={"X-API-KEY": SERPER_KEY, "Content-Type": "application/json"},
+)
+
+
+NO_ANSWER = "No clear answer found. Try rephrasing."
 
-        print("\n🔍 SEARCH RAW:\n", json.dumps(data, indent=2), "\n")
 
-        results = []
+def _web_data(query):
+    """Serper search → condensed text block for the prompt (None if too thin)"""
+    response = _HTTP.post("https://google.serper.dev/search", json={"q": query})
+    response.raise_for_status()  # don't treat 4xx/5xx bodies (and cache them) as "no answer"
+    data = orjson.loads(response.content)
 
-        # Organic search results
-        for item in data.get("organic", [])[:6]:
-            title = item.get("title", "")
-            snippet = item.get("snippet", "")
-            results.append(f"{title}: {snippet}")
+    logger.debug("🔍 SEARCH RAW: %s", data)
 
-        # AnswerBox / Knowledge Graph extraction (HIGH PRIORITY)
-        if "answerBox" in data and "answer" in data["answerBox"]:
-            results.insert(0, "ANSWER: " + data["answerBox"]["answer"])
-        
-        if "knowledgeGraph" in data and "title" in data["knowledgeGraph"]:
-            kg = data["knowledgeGraph"]
-            results.insert(0, f"{kg.get('title','')} — {kg.get('description','')}")
+    results = []
 
-        info = "\n".join(results).strip()
+    # Organic search results
+    for item in data.get("organic", [])[:6]:
+        title = item.get("title", "")
+        snippet = item.get("snippet", "")
+        results.append(f"{title}: {snippet}")
 
-        if len(info) < 25:
-            return "No clear answer found. Try rephrasing."
+    # AnswerBox / Knowledge Graph extraction (HIGH PRIORITY)
+    if "answerBox" in data and "answer" in data["answerBox"]:
+        results.insert(0, "ANSWER: " + data["answerBox"]["answer"])
+    
+    if "knowledgeGraph" in data and "title" in data["knowledgeGraph"]:
+        kg = data["knowledgeGraph"]
+        results.insert(0, f"{kg.get('title','')} — {kg.get('description','')}")
 
-        prompt = f"""
+    info = "\n".join(results[:MAX_RESULTS])[:MAX_INFO_CHARS].strip()
+
+    if len(info) < 25:
+        return None
+    return info
+
+
+def _build_prompt(query, info):
+    return f"""
         You must return answer EXACTLY in this format:
 
         🟢 Answer: <one line direct answer>
@@ -63,10 +90,49 @@ def ai_web_search(query):
         {info}
         """
 
-        model = genai.GenerativeModel("models/gemini-2.5-flash")
-        output = model.generate_content(prompt)
 
-        return output.text.strip()
+def _normalize(query):
+    """Cache key: lowercase, single-spaced, without trailing ?.! punctuation"""
+    return " ".join(query.lower().split()).rstrip("?.! ")
+
+
+@functools.lru_cache(maxsize=1024)
+def _cached_search(norm_query, time_bucket):
+    """Search + answer for a normalized query; exceptions are not cached.
+
+    time_bucket only varies the cache key so entries expire every _CACHE_TTL.
+    """
+    info = _web_data(norm_query)
+    if not info:
+        return NO_ANSWER
+
+    output = _MODEL.generate_content(_build_prompt(norm_query, info))
+
+    return output.text.strip()
+
+
+def ai_web_search(query):
+    """Google Search → Gemini Answer Engine (Strongly Improved Accuracy)"""
+
+    try:
+        return _cached_search(_normalize(query), int(time.time() // _CACHE_TTL))
 
     except Exception as e:
         return f"❌ Web Search Failed → {e}"
+
+
+def ai_web_search_stream(query):
+    """Same as ai_web_search, but yields Gemini's answer as it is generated"""
+
+    try:
+        info = _web_data(query)
+        if not info:
+            yield NO_ANSWER
+            return
+
+        for chunk in _MODEL.generate_content(_build_prompt(query, info), stream=True):
+            if chunk.parts:
+                yield chunk.text
+
+    except Exception as e:
+        yield f"❌ Web Search Failed → {e}"
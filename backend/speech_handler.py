@@ -4,9 +4,20 @@ Handles speech-to-text and text-to-speech functionality
 """
 import speech_recognition as sr
 import pyttsx3
-import time
+import json
+import os
+import queue
 import threading
 
+# Optional offline recognizer (pip install vosk + download a model)
+try:
+    from vosk import Model as VoskModel, KaldiRecognizer
+except ImportError:
+    VoskModel = None
+
+VOSK_MODEL_PATH = os.getenv("VOSK_MODEL_PATH", "model/vosk-small-en-us")
+VOSK_SAMPLE_RATE = 16000
+
 
 class SpeechHandler:
     """
@@ -16,19 +27,32 @@ class SpeechHandler:
     def __init__(self):
         # Initialize recognizer for speech-to-text
         self.recognizer = sr.Recognizer()
-        self.microphone = sr.Microphone()
+        try:
+            self.microphone = sr.Microphone()
+        except Exception as e:
+            print(f"Microphone unavailable: {str(e)}")
+            self.microphone = None
         
-        # Initialize text-to-speech engine
-        self.tts_engine = pyttsx3.init()
-        self._configure_tts()
+        # Local speech recognition if Vosk and its model are available
+        self.vosk_model = None
+        if VoskModel is not None and os.path.isdir(VOSK_MODEL_PATH):
+            self.vosk_model = VoskModel(VOSK_MODEL_PATH)
         
-        # Thread lock for TTS
-        self.tts_lock = threading.Lock()
+        # Calibrate for ambient noise once; listen() reuses the threshold
+        self._energy = self.recognizer.energy_threshold
+        self.recalibrate()
+        
+        # Text-to-speech: one worker thread owns the engine and speaks
+        # queued text in order (pyttsx3 engines are not reentrant)
+        self.tts_engine = None
+        self._tts_queue = queue.Queue()
+        self._tts_thread = threading.Thread(target=self._tts_loop, daemon=True)
+        self._tts_thread.start()
     
     def _configure_tts(self):
         """Configure text-to-speech settings"""
         # Set properties
-        self.tts_engine.setProperty('rate', 150)  # Speed of speech
+        self.tts_engine.setProperty('rate', 175)  # Speed of speech
         self.tts_engine.setProperty('volume', 0.9)  # Volume (0.0 to 1.0)
         
         # Try to set a voice (optional)
@@ -37,6 +61,43 @@ class SpeechHandler:
             # Use first available voice (usually default)
             self.tts_engine.setProperty('voice', voices[0].id)
     
+    def _tts_loop(self):
+        """Worker thread: initialise the engine once, then speak queued text"""
+        while True:
+            text = self._tts_queue.get()
+            if text is None:
+                break
+            try:
+                if self.tts_engine is None:
+                    self.tts_engine = pyttsx3.init()
+                    self._configure_tts()
+                self.tts_engine.say(text)
+                self.tts_engine.runAndWait()
+            except Exception as e:
+                print("🔴 TTS ERROR:", e)
+                self.tts_engine = None  # re-initialise on next utterance
+    
+    def speak(self, text):
+        """Queue text to be spoken; returns immediately"""
+        self._tts_queue.put(text)
+    
+    def recalibrate(self, duration=1.0):
+        """
+        Sample ambient noise and cache the resulting energy threshold
+        Returns:
+            Boolean indicating if calibration succeeded
+        """
+        if self.microphone is None:
+            return False
+        try:
+            with self.microphone as source:
+                self.recognizer.adjust_for_ambient_noise(source, duration=duration)
+            self._energy = self.recognizer.energy_threshold
+            return True
+        except Exception as e:
+            print(f"Microphone calibration failed: {str(e)}")
+            return False
+    
     def listen(self, timeout=5, phrase_time_limit=10):
         """
         Listen to microphone and convert speech to text
@@ -46,11 +107,14 @@ class SpeechHandler:
         Returns:
             Recognized text or error message
         """
+        if self.microphone is None:
+            return "ERROR: No microphone available."
         try:
             with self.microphone as source:
                 print("Listening...")
-                # Adjust for ambient noise
-                self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
+                # Start from the calibrated noise floor (see recalibrate)
+                self.recognizer.energy_threshold = self._energy
+                self.recognizer.dynamic_energy_threshold = True
                 
                 # Listen for audio
                 audio = self.recognizer.listen(
@@ -61,8 +125,7 @@ class SpeechHandler:
                 
                 print("Processing speech...")
                 
-                # Recognize speech using Google Speech Recognition
-                text = self.recognizer.recognize_google(audio)
+                text = self._recognize(audio)
                 print(f"You said: {text}")
                 return text
                 
@@ -74,24 +137,20 @@ class SpeechHandler:
             return f"ERROR: Could not request results; {e}"
         except Exception as e:
             return f"ERROR: An error occurred: {str(e)}"
-
-
-class SpeechHandler:
-
-    def __init__(self):
-        pass  # NO persistent engine anymore
-
-    def speak(self, text):
-        try:
-            engine = pyttsx3.init()   # <-- NEW: reinitialize every time
-            engine.setProperty('rate', 175)
-            engine.say(text)
-            engine.runAndWait()
-            engine.stop()
-            del engine
-        except Exception as e:
-            print("🔴 TTS ERROR:", e)
-
+    
+    def _recognize(self, audio):
+        """Recognize with local Vosk if loaded, else Google Speech Recognition"""
+        if self.vosk_model is None:
+            return self.recognizer.recognize_google(audio)
+        
+        rec = KaldiRecognizer(self.vosk_model, VOSK_SAMPLE_RATE)
+        rec.AcceptWaveform(
+            audio.get_raw_data(convert_rate=VOSK_SAMPLE_RATE, convert_width=2)
+        )
+        text = json.loads(rec.FinalResult()).get("text", "")
+        if not text:
+            raise sr.UnknownValueError()
+        return text
     
     def test_microphone(self):
         """
@@ -99,6 +158,8 @@ class SpeechHandler:
         Returns:
             Boolean indicating if microphone is accessible
         """
+        if self.microphone is None:
+            return False
         try:
             with self.microphone as source:
                 self.recognizer.adjust_for_ambient_noise(source, duration=1)
@@ -108,8 +169,10 @@ class SpeechHandler:
             return False
     
     def stop(self):
-        """Stop the TTS engine"""
+        """Stop the TTS engine and its worker thread"""
+        self._tts_queue.put(None)
         try:
-            self.tts_engine.stop()
+            if self.tts_engine is not None:
+                self.tts_engine.stop()
         except Exception as e:
             print(f"Error stopping TTS engine: {str(e)}")
\ No newline at end of file
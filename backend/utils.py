@@ -7,24 +7,135 @@ Utility functions for Personal Assistant
 """
 
 import re
-from datetime import datetime
+import ast
+import functools
+import operator
+from datetime import date, datetime
 import math
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson
+from dotenv import load_dotenv
 import os
 
+# Optional linear-time (DFA) engine for the reminder time patterns
+try:
+    import re2 as _time_re
+except ImportError:
+    _time_re = re
+
+# ================= PRECOMPILED PATTERNS ===================
+
+# math
+_SAFE_EXPR_RE = re.compile(r"[0-9\.\+\-\*\/\(\)\s]+")
+# word operators -> symbol; longer phrases first within each group
+_OP_BY_GROUP = {"plus": "+", "minus": "-", "mul": "*", "div": "/"}
+_OP_WORDS_RE = re.compile(
+    r"(?P<plus>\bplus\b|\badd(?:ed)?\b)"
+    r"|(?P<minus>\bminus\b|\bsubtract(?:ed)?\b)"
+    r"|(?P<mul>\binto\b|\btimes\b|\bmultiplied by\b|\bmultiply\b)"
+    r"|(?P<div>\bdivided by\b|\bdivide\b|\bover\b)"
+)
+_EXPR_START_CHARS = frozenset("0123456789()")
+_EXPR_CHARS = "0123456789.+-*/()"
+# deletes every ASCII char (incl. whitespace) that can't appear in an expression
+_DROP_NON_EXPR = str.maketrans(
+    "", "", "".join(chr(i) for i in range(128) if chr(i) not in _EXPR_CHARS)
+)
+_NON_EXPR_RE = re.compile(r"[^0-9\.\+\-\*\/\(\)]")  # non-ASCII fallback
+
+# reminder NLP
+# one pass: "p.m." / "p. m." -> "pm", and any whitespace that isn't a single
+# space (runs, tabs, newlines) -> " "
+_NORMALISE_RE = re.compile(r"([ap])\.\s*m\.|\s{2,}|[^\S ]")
+_REL_RE = _time_re.compile(r"\b(in|after)\s+\d+\s+(minutes?|minute|mins?|hours?|hour|hrs?)\b")
+_AT_RE = _time_re.compile(r"\bat\s+(\d{1,2}(:\d{2})?\s*(am|pm)?)\b")
+_BARE_TIME_RE = _time_re.compile(r"\b(\d{1,2}(:\d{2})?\s*(am|pm))\b")
+_24H_RE = _time_re.compile(r"\b\d{1,2}:\d{2}\b")
+# (pattern, group holding the time) in priority order:
+#   1) relative "in X minutes/hours" / "after X minutes"
+#   2) "at HH:MM am/pm" or "at 7 pm"
+#   3) bare time somewhere ("7:45 pm", "7 pm")
+#   4) pure 24h time like "19:30"
+_TIME_PATTERNS = (
+    (_REL_RE, 0),
+    (_AT_RE, 1),
+    (_BARE_TIME_RE, 1),
+    (_24H_RE, 0),
+)
+# leading helper phrases ("remind me to", "set a reminder", ...) and a dangling "at"
+_CLEANUP_PREFIX_RE = re.compile(
+    r"^\s*(?:remind me to\s+"
+    r"|remind me\s+"
+    r"|set (?:a )?reminder (?:for )?(?:to )?"
+    r"|set (?:a )?reminder\s+"
+    r"|reminder (?:to )?)",
+    re.IGNORECASE,
+)
+_CLEANUP_TRAIL_RE = re.compile(r"\s*\bat\s*$", re.IGNORECASE)
+_TO_RE = re.compile(r"(?i)to (.+)")
+
 # ================= TIME & DATE ===================
 
 def get_current_time():
     now = datetime.now()
-    return now.strftime("The current time is %I:%M %p")
+    hour12 = now.hour % 12 or 12
+    meridiem = "AM" if now.hour < 12 else "PM"
+    return f"The current time is {hour12:02d}:{now.minute:02d} {meridiem}"
+
+_date_text = {}  # single entry: today's date -> formatted sentence
 
 def get_current_date():
-    now = datetime.now()
-    return now.strftime("Today's date is %A, %B %d, %Y")
+    today = date.today()
+    text = _date_text.get(today)
+    if text is None:
+        text = today.strftime("Today's date is %A, %B %d, %Y")
+        _date_text.clear()
+        _date_text[today] = text
+    return text
 
 
 # ================= MATH ===================
 
+_BINOPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Pow: operator.pow,
+}
+_UNARYOPS = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+# Bounds for ** so something like 9**9**8 can't pin the worker computing a huge int
+_MAX_EXPONENT = 100
+_MAX_POW_BITS = 10_000
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_expression(expression: str) -> ast.expr:
+    """Parse once per distinct expression; repeats reuse the tree."""
+    return ast.parse(expression.strip(), mode="eval").body
+
+
+def _eval_node(node: ast.expr):
+    """Evaluate numeric constants and + - * / // ** nodes only."""
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        return node.value
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINOPS:
+        left, right = _eval_node(node.left), _eval_node(node.right)
+        if isinstance(node.op, ast.Pow):
+            if abs(right) > _MAX_EXPONENT:
+                raise ValueError("Exponent too large")
+            if isinstance(left, int) and abs(left).bit_length() * abs(right) > _MAX_POW_BITS:
+                raise ValueError("Result too large")
+        return _BINOPS[type(node.op)](left, right)
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARYOPS:
+        return _UNARYOPS[type(node.op)](_eval_node(node.operand))
+    raise ValueError("Unsupported expression")
+
+
 def calculate_math(expression: str) -> str:
     """
     Safely evaluate a basic math expression.
@@ -32,19 +143,24 @@ def calculate_math(expression: str) -> str:
     """
     try:
         # Only allow safe characters
-        if not re.fullmatch(r"[0-9\.\+\-\*\/\(\)\s]+", expression):
+        if not _SAFE_EXPR_RE.fullmatch(expression):
             return "I can only calculate basic numeric expressions."
-        result = eval(expression, {"__builtins__": {}}, {})
+        result = _eval_node(_parse_expression(expression))
         if isinstance(result, float):
-            # avoid 7.0 style
-            if math.isclose(result, round(result)):
-                result = int(round(result))
+            # avoid 7.0 style (and float noise like 3.0000000000000004)
+            if result.is_integer():
+                result = int(result)
+            else:
+                rounded = round(result)  # int for floats
+                if math.isclose(result, rounded):
+                    result = rounded
         return f"The result is {result}"
     except ZeroDivisionError:
         return "Division by zero is not allowed."
     except Exception:
         return "I couldn't evaluate that expression. Please check the numbers and operators."
 
+@functools.lru_cache(maxsize=512)
 def extract_math_expression(command: str) -> str | None:
     """
     Extract a math expression from a natural language command.
@@ -54,73 +170,113 @@ def extract_math_expression(command: str) -> str | None:
     """
     c = command.lower()
 
-    # Replace word operators with symbols
-    replacements = {
-        r"\bplus\b": "+",
-        r"\badd(ed)?\b": "+",
-        r"\bminus\b": "-",
-        r"\bsubtract(ed)?\b": "-",
-        r"\binto\b": "*",
-        r"\btimes\b": "*",
-        r"\bmultiply\b": "*",
-        r"\bmultiplied by\b": "*",
-        r"\bdivided by\b": "/",
-        r"\bdivide\b": "/",
-        r"\bover\b": "/",
-    }
-    expr = c
-    for pattern, sym in replacements.items():
-        expr = re.sub(pattern, f" {sym} ", expr)
-
-    # Take everything from the first digit/symbol onwards
-    m = re.search(r"[0-9\(\)]+.*", expr)
-    if not m:
+    # Replace word operators with symbols (single pass)
+    expr = _OP_WORDS_RE.sub(lambda m: f" {_OP_BY_GROUP[m.lastgroup]} ", c)
+
+    # Take everything from the first digit/paren onwards
+    start = next((i for i, ch in enumerate(expr) if ch in _EXPR_START_CHARS), -1)
+    if start < 0:
         return None
 
-    expr = m.group(0)
-    expr = re.sub(r"[^0-9\.\+\-\*\/\(\)\s]", " ", expr)
-    expr = re.sub(r"\s+", "", expr)
+    expr = expr[start:].translate(_DROP_NON_EXPR)
+    if not expr.isascii():
+        expr = _NON_EXPR_RE.sub("", expr)
     return expr if expr else None
 
 
 # ================= BASIC WEB SEARCH (SERPER) ===================
 
+# Read once at import (.env loaded first so import order doesn't matter)
+load_dotenv()
+_SERPER_API_KEY = os.getenv("SERPER_API_KEY")
+
+# Shared session: reuses the TCP+TLS connection to Serper between calls
+_SESSION = requests.Session()
+# One quick retry on throttling/5xx (search is idempotent, so POST is safe).
+# Retry-After is ignored so a 429 can't stall the request for a minute.
+_SEARCH_RETRY = Retry(
+    total=1,
+    backoff_factor=0.25,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset({"POST"}),
+    respect_retry_after_header=False,
+)
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(pool_connections=2, pool_maxsize=4, max_retries=_SEARCH_RETRY),
+)
+_SESSION.headers.update({"Content-Type": "application/json"})
+_SEARCH_WORKERS = 4  # matches pool_maxsize
+_SEARCH_TIMEOUT = (2.0, 3.0)  # (connect, read) seconds
+
+
+@functools.lru_cache(maxsize=256)
+def _search_web_cached(query: str) -> str:
+    """Serper lookup for a normalised query. Raises on failure so errors aren't cached."""
+    resp = _SESSION.post(
+        "https://google.serper.dev/search",
+        data=orjson.dumps({"q": query, "num": 3}),
+        headers={"X-API-KEY": _SERPER_API_KEY},
+        timeout=_SEARCH_TIMEOUT,
+    )
+    resp.raise_for_status()  # bad key / no credits must not be cached as "no results"
+    data = orjson.loads(resp.content)
+    snippets = []
+
+    for item in (data.get("organic") or [])[:3]:
+        title = item.get("title", "")
+        snippet = item.get("snippet", "")
+        if title or snippet:
+            snippets.append(f"- {title}: {snippet}")
+
+    if not snippets:
+        return "No results found. Try a more specific query."
+
+    return "Here are some results I found:\n" + "\n".join(snippets)
+
+
 def search_web(query: str) -> str:
     """
     Fallback simple web search using Serper.dev (if API key configured).
-    Returns a short summary string.
+    Returns a short summary string; repeat queries are served from cache.
     """
-    api_key = os.getenv("SERPER_API_KEY")
-    if not api_key:
+    if not _SERPER_API_KEY:
         return "Web search is not configured. Please add a SERPER_API_KEY."
 
     try:
-        resp = requests.post(
-            "https://google.serper.dev/search",
-            json={"q": query, "num": 3},
-            headers={"X-API-KEY": api_key, "Content-Type": "application/json"},
-            timeout=8,
-        )
-        data = resp.json()
-        snippets = []
-
-        for item in (data.get("organic") or [])[:3]:
-            title = item.get("title", "")
-            snippet = item.get("snippet", "")
-            if title or snippet:
-                snippets.append(f"- {title}: {snippet}")
-
-        if not snippets:
-            return "No results found. Try a more specific query."
-
-        return "Here are some results I found:\n" + "\n".join(snippets)
-
+        return _search_web_cached(query.strip().lower())
     except Exception as e:
         return f"Web search failed: {e}"
 
 
+def search_web_many(queries: list[str]) -> list[str]:
+    """
+    Run several search_web calls concurrently over the shared session,
+    so N queries take about one round-trip instead of N.
+    Results are returned in the same order as `queries`.
+    """
+    if len(queries) <= 1:
+        return [search_web(q) for q in queries]
+
+    with ThreadPoolExecutor(max_workers=min(len(queries), _SEARCH_WORKERS)) as pool:
+        return list(pool.map(search_web, queries))
+
+
 # ================= REMINDER NLP ===================
 
+def _normalise_repl(m):
+    return m.group(1) + "m" if m.group(1) else " "
+
+
+def _normalise(text: str) -> str:
+    """Lowercase, normalise a.m./p.m. and collapse whitespace in one regex pass."""
+    # transcribed speech is usually lowercase already; skip the copy then
+    if not text.islower():
+        text = text.lower()
+    return _NORMALISE_RE.sub(_normalise_repl, text)
+
+
+@functools.lru_cache(maxsize=512)
 def extract_reminder_info(command: str):
     """
     Extract (reminder_text, time_str) from natural-language reminder commands.
@@ -131,60 +287,33 @@ def extract_reminder_info(command: str):
       - "reminder to call John at 7:45 p.m."
       - "in 20 minutes remind me to drink water"
       - "set reminder after 1 hour to take a break" (treated as 'in 1 hour')
+
+    Pure function of `command` (relative times stay as text), so results are
+    memoised; the returned tuple is immutable.
     """
 
     original = command.strip()
-    text_lower = original.lower()
-
-    # normalise AM/PM variants in a working copy
-    norm = text_lower
-    norm = norm.replace("p.m.", "pm").replace("p. m.", "pm")
-    norm = norm.replace("a.m.", "am").replace("a. m.", "am")
-    norm = re.sub(r"\s+", " ", norm)
-
-    time_str = None
-    time_span = None  # (start, end) indices in original string
-
-    # -------- 1) relative "in X minutes/hours" / "after X minutes" ----------
-    rel_pattern = r"\b(in|after)\s+\d+\s+(minutes?|minute|mins?|hours?|hour|hrs?)\b"
-    m_rel = re.search(rel_pattern, norm)
-    if m_rel:
-        time_str = norm[m_rel.start() : m_rel.end()]
-        time_span = m_rel.start(), m_rel.end()
-
-    # -------- 2) "at HH:MM am/pm" or "at 7 pm" ----------
-    if not time_str:
-        at_pattern = r"\bat\s+(\d{1,2}(:\d{2})?\s*(am|pm)?)\b"
-        m_at = re.search(at_pattern, norm)
-        if m_at:
-            # group(1) is time part only
-            time_str = m_at.group(1)
-            time_span = m_at.start(), m_at.end()
-
-    # -------- 3) bare time somewhere ("7:45 pm", "7 pm") ----------
-    if not time_str:
-        bare_time_pattern = r"\b(\d{1,2}(:\d{2})?\s*(am|pm))\b"
-        m_time = re.search(bare_time_pattern, norm)
-        if m_time:
-            time_str = m_time.group(1)
-            time_span = m_time.start(), m_time.end()
-
-    # -------- 4) pure 24h time like "19:30" ----------
-    if not time_str:
-        m_24 = re.search(r"\b\d{1,2}:\d{2}\b", norm)
-        if m_24:
-            time_str = norm[m_24.start() : m_24.end()]
-            time_span = m_24.start(), m_24.end()
-
-    # If still nothing -> no time parsed at all
-    if not time_str or time_span is None:
+
+    # Every time pattern needs a digit; most non-reminder text has none
+    if not any(ch.isdigit() for ch in original):
+        return None, None
+
+    # normalise case, AM/PM variants and spacing in a working copy
+    norm = _normalise(original)
+
+    # First pattern (in priority order) that matches wins
+    for pattern, group in _TIME_PATTERNS:
+        m = pattern.search(norm)
+        if m:
+            time_str = m.group(group)
+            time_span = m.start(), m.end()  # indices in original string
+            break
+    else:
+        # no time parsed at all
         return None, None
 
-    # Normalize time_str for ReminderManager
+    # time_str comes from norm, so it is already normalised for ReminderManager
     t_norm = time_str.strip()
-    t_norm = t_norm.replace("p.m.", "pm").replace("p. m.", "pm")
-    t_norm = t_norm.replace("a.m.", "am").replace("a. m.", "am")
-    t_norm = re.sub(r"\s+", " ", t_norm)
 
     # Now build reminder text by removing the time phrase from the original
     start, end = time_span
@@ -192,21 +321,13 @@ def extract_reminder_info(command: str):
     reminder_raw = (original[:start] + original[end:]).strip()
 
     # Remove leading helper phrases: "remind me to", "set a reminder", etc.
-    cleanup_patterns = [
-        r"(?i)^\s*remind me to\s+",
-        r"(?i)^\s*remind me\s+",
-        r"(?i)^\s*set (a )?reminder (for )?(to )?",
-        r"(?i)^\s*set (a )?reminder\s+",
-        r"(?i)^\s*reminder (to )?",
-        r"(?i)\s*at\s*$",
-    ]
-    text_clean = reminder_raw
-    for pat in cleanup_patterns:
-        text_clean = re.sub(pat, "", text_clean).strip()
+    text_clean = _CLEANUP_TRAIL_RE.sub(
+        "", _CLEANUP_PREFIX_RE.sub("", reminder_raw, count=1), count=1
+    ).strip()
 
     # Fallbacks: if still empty, try extracting after "to "
     if not text_clean:
-        m_to = re.search(r"(?i)to (.+)", original)
+        m_to = _TO_RE.search(original)
         if m_to:
             text_clean = m_to.group(1).strip()
 
@@ -619,7 +619,9 @@ async function checkReminderAlerts() {
             console.log("Reminder Popup Triggered:", data);
 
             showReminderPopup(data.message);
-            speakText(`Reminder: ${data.message}`);
+            if (data.speak !== false) {
+                speakText(`Reminder: ${data.message}`);
+            }
             showToast(`⏰ ${data.message}`, "warning");
         }
 